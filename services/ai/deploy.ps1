@@ -12,6 +12,8 @@ $openaiKey = Get-EnvValue 'OPENAI_API_KEY'
 $supabaseUrl = Get-EnvValue 'SUPABASE_URL'
 $supabaseServiceRoleKey = Get-EnvValue 'SUPABASE_SERVICE_ROLE_KEY'
 $geminiKey = Get-EnvValue 'GEMINI_API_KEY'
+$gradmateApiKey = Get-EnvValue 'GRADMATE_API_KEY'
+$provisionedConcurrency = Get-EnvValue 'PROVISIONED_CONCURRENCY'
 
 if (-not $openaiKey) {
     Write-Error "OPENAI_API_KEY not found in .env.local file"
@@ -51,12 +53,36 @@ aws lambda update-function-code `
     --region us-east-2
 
 # Update environment variables
-# (includes optional GEMINI_API_KEY)
+# (includes optional GEMINI_API_KEY and GRADMATE_API_KEY; the latter enables the
+# in-function x-api-key check)
 aws lambda update-function-configuration `
     --function-name gradmate-ai-service `
-    --environment "Variables={OPENAI_API_KEY=$openaiKey,SUPABASE_URL=$supabaseUrl,SUPABASE_SERVICE_ROLE_KEY=$supabaseServiceRoleKey,GEMINI_API_KEY=$geminiKey}" `
+    --environment "Variables={OPENAI_API_KEY=$openaiKey,SUPABASE_URL=$supabaseUrl,SUPABASE_SERVICE_ROLE_KEY=$supabaseServiceRoleKey,GEMINI_API_KEY=$geminiKey,GRADMATE_API_KEY=$gradmateApiKey}" `
     --region us-east-2
 
+# Optional: keep pre-initialised environments warm on the 'live' alias so
+# requests routed to it never pay the cold start. Enable by setting
+# PROVISIONED_CONCURRENCY (e.g. 2) in .env.local; API Gateway must target the
+# alias ARN (gradmate-ai-service:live) for it to take effect.
+if ($provisionedConcurrency) {
+    aws lambda wait function-updated --function-name gradmate-ai-service --region us-east-2
+    $version = aws lambda publish-version `
+        --function-name gradmate-ai-service `
+        --query Version --output text `
+        --region us-east-2
+
+    aws lambda update-alias --function-name gradmate-ai-service --name live --function-version $version --region us-east-2 2>$null
+    if ($LASTEXITCODE -ne 0) {
+        aws lambda create-alias --function-name gradmate-ai-service --name live --function-version $version --region us-east-2
+    }
+
+    aws lambda put-provisioned-concurrency-config `
+        --function-name gradmate-ai-service `
+        --qualifier live `
+        --provisioned-concurrent-executions $provisionedConcurrency `
+        --region us-east-2
+}
+
 # Clean up
 Remove-Item -Recurse -Force .\deploy
 Remove-Item function.zip 
\ No newline at end of file
@@ -0,0 +1,182 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+#  In-process caches (module-level instances survive warm Lambda invocations)
+# ---------------------------------------------------------------------------
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire *ttl* seconds after insertion.
+
+    Thread-safe, so it can be shared by the worker pools in the handlers.
+    """
+
+    __slots__ = ("maxsize", "ttl", "_data", "_lock")
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value for *key* (refreshing its LRU slot) or *default*."""
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                return default
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[0] if entry else default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ---------------------------------------------------------------------------
+#  On-disk cache (survives handler re-imports and is shared by every process
+#  that points at the same directory, e.g. /tmp inside one Lambda container)
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+
+class DiskTTLCache:
+    """Small SQLite key/value store with per-entry expiry and a size cap.
+
+    Values must be JSON-serialisable. Each write also deletes expired rows
+    and, past *max_entries* rows or *max_bytes* of stored values, the entries
+    closest to expiry, so the file cannot fill a small disk such as Lambda's
+    /tmp. Storage errors are logged and treated as cache misses so a
+    read-only or full disk never breaks the caller.
+    """
+
+    __slots__ = ("path", "max_entries", "max_bytes", "_ready")
+
+    def __init__(self, path: str, max_entries: int = 1000, max_bytes: int | None = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            conn.execute(
+                "create table if not exists entries "
+                "(key text primary key, value text, size integer, expires_at real)"
+            )
+            conn.execute("create index if not exists entries_expires_at on entries (expires_at)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute("select value, expires_at from entries where key = ?", (key,)).fetchone()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Disk cache read failed (%s): %s", self.path, exc)
+            return default
+        if row is None or row[1] <= time.time():
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        payload = json.dumps(value)  # ASCII (ensure_ascii), so len() is the byte size
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "insert or replace into entries (key, value, size, expires_at) values (?, ?, ?, ?)",
+                    (key, payload, len(payload), now + ttl),
+                )
+                self._prune(conn, now)
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Disk cache write failed (%s): %s", self.path, exc)
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then evict the soonest-expiring ones until under both caps."""
+        conn.execute("delete from entries where expires_at <= ?", (now,))
+        count, total = conn.execute("select count(*), coalesce(sum(size), 0) from entries").fetchone()
+        max_bytes = self.max_bytes if self.max_bytes is not None else float("inf")
+        if count <= self.max_entries and total <= max_bytes:
+            return
+        evict = []
+        for key, size in conn.execute("select key, size from entries order by expires_at"):
+            if count <= self.max_entries and total <= max_bytes:
+                break
+            evict.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("delete from entries where key = ?", evict)
+
+
+def disk_cached(cache: DiskTTLCache, ttl: float, negative_ttl: float) -> Callable:
+    """Memoise a function of string arguments in *cache*.
+
+    Arguments are normalised (stripped, lower-cased) so trivially different
+    spellings share an entry. A ``RuntimeError`` – how the discovery resolvers
+    report "not found" – is remembered for *negative_ttl* seconds and re-raised
+    on later hits instead of repeating the slow lookup.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps([fn.__name__, *(str(v).strip().lower() for v in bound.arguments.values())])
+
+            hit = cache.get(key, _MISSING)
+            if hit is not _MISSING:
+                if "error" in hit:
+                    raise RuntimeError(hit["error"])
+                return hit["value"]
+
+            try:
+                value = fn(*args, **kwargs)
+            except RuntimeError as exc:
+                cache.set(key, {"error": str(exc)}, negative_ttl)
+                raise
+            cache.set(key, {"value": value}, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -1,13 +1,23 @@
 import logging
 import requests
 import re
+import heapq
 import json
-from urllib.parse import urljoin, urlparse, quote_plus
+from collections import defaultdict
+from operator import itemgetter
+from urllib.parse import urljoin, urlparse, urlsplit, quote_plus
 from typing import Dict, Any, List
 import os
+import random
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.handlers.cache import DiskTTLCache, TTLCache, disk_cached
+from src.handlers.session import HTML_PARSER, SESSION, lxml_html, normalize_url, parse_body
 
 # Optional Google Gemini integration
 try:
@@ -24,36 +34,141 @@ logger.setLevel(logging.INFO)
 # Configuration & session setup
 # ---------------------------------------------------------------------------
 
-SESSION = requests.Session()
-SESSION.headers.update({
-    "User-Agent": "Mozilla/5.0 (compatible; ResearchURLBot/1.0; +https://example.com/bot)"
-})
 
 _RESEARCH_WORDS = re.compile(r"research|labs?|groups?", re.I)
 
 # Regex to detect "Firstname Lastname" patterns (optionally with middle initial)
 PROF_NAME_RE = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z]\.)?\s+[A-Z][a-z]+)\b")
 
+# Patterns used in the per-line / per-lab loops, compiled once
+_URL_RE = re.compile(r"https?://[\w./\-_%]+")
+# The lookbehind pins each attempt to the start of a [\w.-] run. Without it a
+# long run with no "@" (minified JS, base64 images) is rescanned from every
+# offset, which is quadratic; the leftmost match is the same either way.
+_EMAIL_RE = re.compile(r"(?<![\w.-])[\w.-]+@[\w.-]+\.\w+")
+_NAME_RE = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\b")
+_NON_ALPHA_RE = re.compile(r"[^a-zA-Z ]")
+_RESEARCH_HEADING_RE = re.compile(rb"<h[1-4][^>]*>[^<]*(?:research|lab|group)", re.I)
+_FACULTY_RE = re.compile(r"(?:Faculty|Professors?)[:\s]+(.+)", re.I)
+_LIST_SEP_RE = re.compile(r",|;")
+_JSON_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_JSON_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+
+# Parse only anchors when score_links has to fall back to BeautifulSoup
+_A_STRAINER = SoupStrainer("a", href=True)
+# _extract_lab_areas looks at no more headings than this (output is capped at 40 labs)
+_MAX_LAB_HEADINGS = 80
+# ... and walks at most this many section elements after each heading
+_LAB_SECTION_TAGS = ["h2", "h3", "h4", "p", "div", "span", "li"]
+_LAB_SECTION_SCAN = 60
+
+# is_research_page streams at most this many bytes looking for a heading
+_RESEARCH_SCAN_LIMIT = 200_000
+
+# Resolved domain / department / research URLs barely change, so they are kept
+# on disk for a week; failed resolutions are remembered for an hour.
+_CACHE_DIR = os.getenv("GRADMATE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "gradmate")
+_URL_CACHE = DiskTTLCache(os.path.join(_CACHE_DIR, "urls.sqlite3"))
+_URL_CACHE_TTL = int(os.getenv("URL_CACHE_TTL_SECS", "604800"))  # 7 days
+_URL_CACHE_NEGATIVE_TTL = int(os.getenv("URL_CACHE_NEGATIVE_TTL_SECS", "3600"))
+_url_cached = disk_cached(_URL_CACHE, _URL_CACHE_TTL, _URL_CACHE_NEGATIVE_TTL)
+
+# Page HTML returned by fetch(), keyed by normalised URL
+_FETCH_CACHE = TTLCache(512, int(os.getenv("FETCH_CACHE_TTL_SECS", "600")))
+
+# Pages that came with an ETag / Last-Modified are also kept on disk so later
+# requests revalidate them with a conditional GET (a bodiless 304 when unchanged).
+# Capped by count and bytes: /tmp is only 512 MB and shared with the URL cache.
+_PAGE_CACHE = DiskTTLCache(
+    os.path.join(_CACHE_DIR, "pages.sqlite3"),
+    max_entries=int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "500")),
+    max_bytes=int(os.getenv("PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+_PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL_SECS", "604800"))  # 7 days
+_PAGE_CACHE_MAX_CHARS = 1_000_000
+
+# Shared pool for the URL-pattern probes (threads are reused across warm invocations)
+_PROBE_POOL = ThreadPoolExecutor(max_workers=16)
+
 # ---------------------------------------------------------------------------
 # Helper wrappers
 # ---------------------------------------------------------------------------
 
+
 def fetch(url: str, timeout: int = 10) -> str:
-    """Return the HTML of *url* (raise if request fails)."""
-    r = SESSION.get(url, timeout=timeout)
-    r.raise_for_status()
-    return r.text
+    """Return the HTML of *url* (raise if request fails).
+
+    Successful responses are cached briefly per URL: discovery and enrichment
+    often hit the same department, lab and profile pages more than once. Past
+    that, a copy on disk is revalidated with If-None-Match / If-Modified-Since.
+    """
+    key = normalize_url(url)
+    html = _FETCH_CACHE.get(key)
+    if html is not None:
+        return html
+
+    stored = _PAGE_CACHE.get(key)
+    headers = {}
+    if stored:
+        if stored["etag"]:
+            headers["If-None-Match"] = stored["etag"]
+        if stored["last_modified"]:
+            headers["If-Modified-Since"] = stored["last_modified"]
+    r = SESSION.get(url, timeout=timeout, headers=headers)
+    if stored and r.status_code == 304:
+        html = stored["html"]
+    else:
+        r.raise_for_status()
+        html = r.text
+        etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        if (etag or last_modified) and len(html) <= _PAGE_CACHE_MAX_CHARS:
+            _PAGE_CACHE.set(key, {"etag": etag, "last_modified": last_modified, "html": html}, _PAGE_CACHE_TTL)
+    _FETCH_CACHE.set(key, html)
+    return html
 
 
 def _domain_live(domain: str) -> bool:
-    """Check if a domain is reachable."""
+    """Check if a domain is reachable (HEAD – the body is never needed)."""
     try:
-        SESSION.get(f"https://{domain}", timeout=5)
+        SESSION.head(f"https://{domain}", allow_redirects=True, timeout=5)
         return True
     except requests.RequestException:
         return False
 
 
+def _live_domain_or_none(domain: str) -> str | None:
+    """Probe adapter for :func:`_first_ok`."""
+    return domain if _domain_live(domain) else None
+
+
+def _head_ok(url: str) -> str | None:
+    """HEAD *url* (following redirects); return the final URL if it resolved below 400."""
+    resp = SESSION.head(url, allow_redirects=True, timeout=6)
+    return resp.url if resp.status_code < 400 else None
+
+
+def _first_ok(candidates: List[str], probe) -> str | None:
+    """Run *probe* on every candidate concurrently.
+
+    Returns the first truthy result in *candidates* order (so earlier patterns
+    keep their priority) and cancels the probes that are no longer needed.
+    """
+    futures = [_PROBE_POOL.submit(probe, c) for c in candidates]
+    try:
+        for cand, fut in zip(candidates, futures):
+            try:
+                result = fut.result()
+            except Exception as e:
+                logger.debug("Probe failed for %s: %s", cand, e)
+                continue
+            if result:
+                return result
+        return None
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
 def _scrape_duckduckgo_html(query: str, max_results: int = 10):
     """Fallback HTML scraper for DuckDuckGo search results."""
     url = f"https://duckduckgo.com/html/?q={quote_plus(query)}&kl=us-en"
@@ -61,9 +176,9 @@ def _scrape_duckduckgo_html(query: str, max_results: int = 10):
         html = fetch(url)
     except Exception:
         return []
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, HTML_PARSER)
     results = []
-    for a in soup.select("a.result__a")[:max_results]:
+    for a in soup.select("a.result__a", limit=max_results):
         href = a.get("href", "")
         if href:
             results.append({"href": href})
@@ -83,10 +198,57 @@ def safe_text_search(query: str, max_results: int = 10):
 # Google Gemini helper
 # ---------------------------------------------------------------------------
 
-# After _GEMINI_ENABLED definition add cache globals
-_GEMINI_CACHE: dict[tuple[str, str], tuple[str | None, float]] = {}
+
+_GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_GEMINI_API_KEY")
+# The SDK is configured once and models are built once per model id
+_GEMINI_CONFIGURED = False
+_GEMINI_MODELS: dict[str, Any] = {}
+_GEMINI_LOCK = threading.Lock()
+
+
+def _gemini_model(model_id: str):
+    """Return the shared GenerativeModel for *model_id*, configuring the SDK on first use."""
+    global _GEMINI_CONFIGURED
+    with _GEMINI_LOCK:
+        if not _GEMINI_CONFIGURED:
+            genai.configure(api_key=_GEMINI_API_KEY)
+            _GEMINI_CONFIGURED = True
+        model = _GEMINI_MODELS.get(model_id)
+        if model is None:
+            model = _GEMINI_MODELS[model_id] = genai.GenerativeModel(model_id)
+        return model
+
+
+# Caps in-flight Gemini calls across every worker thread (per-lab enrichment fans out)
+_GEMINI_SEMAPHORE = threading.BoundedSemaphore(int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")))
+
+
+def _gemini_generate(model, prompt: str, generation_config: dict, attempts: int = 3):
+    """``model.generate_content`` behind the concurrency cap, retrying 429s with jittered backoff."""
+    for attempt in range(attempts):
+        try:
+            with _GEMINI_SEMAPHORE:
+                return model.generate_content(prompt, generation_config=generation_config)
+        except Exception as exc:
+            # google.api_core's ResourceExhausted carries code 429
+            throttled = getattr(exc, "code", None) == 429 or "429" in str(exc)
+            if not throttled or attempt == attempts - 1:
+                raise
+            delay = min(8.0, 1.0 * 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.info("Gemini rate-limited; retrying in %.2fs", delay)
+            time.sleep(delay)
+
+
 # Default cache TTL (seconds). Overridable via env var GEMINI_CACHE_TTL_SECS
 _GEMINI_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL_SECS", "21600"))  # 6 hours
+# (college, major) -> suggested research URL, or None for "Gemini had no answer"
+_GEMINI_CACHE = TTLCache(10_000, _GEMINI_CACHE_TTL)
+_CACHE_MISS = object()
+# Gemini URL -> final URL after a successful HEAD; re-verified once this expires
+_GEMINI_VERIFIED = TTLCache(1024, int(os.getenv("GEMINI_VERIFY_TTL_SECS", "3600")))
+# (lab_url, college) -> (names, email_map) from _gemini_extract_professors
+_GEMINI_PROFS_CACHE = TTLCache(1024, _GEMINI_CACHE_TTL)
+
 
 def _gemini_suggest_research_url(college: str, major: str, root_domain: str | None = None) -> str | None:
     """Ask Gemini (if configured) to return the canonical research/labs URL for the department.
@@ -97,12 +259,15 @@ def _gemini_suggest_research_url(college: str, major: str, root_domain: str | No
     if not _GEMINI_ENABLED:
         return None
 
-    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_GEMINI_API_KEY")
-    if not api_key:
+    if not _GEMINI_API_KEY:
         return None
 
+    key = (college.strip().lower(), major.strip().lower())
+    cached = _GEMINI_CACHE.get(key, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return cached
+
     try:
-        genai.configure(api_key=api_key)
         prompt = (
             "You are a highly precise web knowledge assistant. "
             "Task: provide the SINGLE canonical HTTPS URL that lists research labs, research groups, or active research areas "
@@ -117,8 +282,9 @@ def _gemini_suggest_research_url(college: str, major: str, root_domain: str | No
 
         # Pick model – allow override via env, default to the fast Gemini-1.5 Flash
         gemini_model_id = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-        model = genai.GenerativeModel(gemini_model_id)
-        chat = model.generate_content(
+        model = _gemini_model(gemini_model_id)
+        chat = _gemini_generate(
+            model,
             prompt,
             generation_config={"temperature": 0.2, "max_output_tokens": 64},
         )
@@ -129,7 +295,7 @@ def _gemini_suggest_research_url(college: str, major: str, root_domain: str | No
             text = chat.candidates[0].content.strip() if getattr(chat, "candidates", None) else ""
 
         # Extract first URL from Gemini answer
-        m = re.search(r"https?://[\w./\-_%]+", text)
+        m = _URL_RE.search(text)
         if not m:
             return None
         url = m.group(0)
@@ -141,37 +307,63 @@ def _gemini_suggest_research_url(college: str, major: str, root_domain: str | No
         # ensure it looks like research/labs page
         if any(token in url.lower() for token in ("research", "labs", "groups")):
             logger.info("Gemini suggested research URL: %s", url)
-            # Before return of valid url (inside try success path) store into cache
-            key = (college.strip().lower(), major.strip().lower())
-            now = time.time()
-            _GEMINI_CACHE[key] = (url, now)
+            _GEMINI_CACHE.set(key, url)
             return url
     except Exception as e:
         logger.warning("Gemini API failed: %s", e)
 
     # Cache negative result to avoid repeated slow calls during the TTL window
-    key = (college.strip().lower(), major.strip().lower())
-    _GEMINI_CACHE[key] = (None, time.time())
+    _GEMINI_CACHE.set(key, None)
 
     return None
 
+
+def _extract_json_array(text: str) -> str:
+    """Strip markdown fences / surrounding prose from a model reply, leaving the JSON array."""
+    text = _JSON_FENCE_RE.sub("", text.strip())
+    m = _JSON_ARRAY_RE.search(text)
+    return m.group(0) if m else text
+
+
+def _bounded_text(soup: BeautifulSoup, limit: int) -> str:
+    """Like ``soup.get_text(" ", strip=True)[:limit]`` but stops walking once *limit* is reached."""
+    parts: list[str] = []
+    total = 0
+    for piece in soup.stripped_strings:
+        parts.append(piece)
+        total += len(piece) + 1
+        if total > limit:
+            break
+    return " ".join(parts)[:limit]
+
+
 def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tuple[list[str], dict[str, str]]:
     """Use Gemini to list professors + email for a given lab page URL.
 
     Returns (names_list, email_map). Empty list/map if not available or Gemini disabled.
+    Results – empty ones included – are cached per lab URL for the Gemini cache TTL.
     """
 
+    key = (lab_url, college)
+    cached = _GEMINI_PROFS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    result = _gemini_extract_professors_uncached(lab_url, college)
+    _GEMINI_PROFS_CACHE.set(key, result)
+    return result
+
+
+def _gemini_extract_professors_uncached(lab_url: str, college: str | None) -> tuple[list[str], dict[str, str]]:
+
     if not _GEMINI_ENABLED:
         return [], {}
 
-    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_GEMINI_API_KEY")
-    if not api_key:
+    if not _GEMINI_API_KEY:
         return [], {}
 
     try:
-        genai.configure(api_key=api_key)
         gemini_model_id = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
-        model = genai.GenerativeModel(gemini_model_id)
+        model = _gemini_model(gemini_model_id)
 
         prompt = (
             "You are an expert assistant specialised in analysing university lab webpages. "
@@ -183,7 +375,7 @@ def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tupl
             "Respond now:" 
         )
 
-        chat = model.generate_content(prompt, generation_config={"temperature": 0.2, "max_output_tokens": 256})
+        chat = _gemini_generate(model, prompt, generation_config={"temperature": 0.2, "max_output_tokens": 256})
         text = chat.text if hasattr(chat, "text") else chat.candidates[0].content
 
         # ---------------------------------------------------------------
@@ -199,12 +391,12 @@ def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tupl
                 if not line:
                     continue
                 # simple e-mail capture
-                em_match = re.search(r"[\w.-]+@[\w.-]+\.\w+", line)
+                em_match = _EMAIL_RE.search(line)
                 email_val = em_match.group(0) if em_match else ""
                 # remove email from line to leave name portion
                 name_part = line.replace(email_val, "").strip(" ():,;-")
                 # crude name detection: at least two capitalized words
-                mname = re.search(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\b", name_part)
+                mname = _NAME_RE.search(name_part)
                 if mname:
                     name_val = mname.group(1).strip()
                     if name_val and name_val not in names_local:
@@ -216,7 +408,7 @@ def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tupl
         names: list[str] = []
         emails: dict[str, str] = {}
         try:
-            data = json.loads(text)
+            data = json.loads(_extract_json_array(text))
             if isinstance(data, list):
                 for obj in data:
                     if isinstance(obj, dict) and "name" in obj:
@@ -236,11 +428,9 @@ def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tupl
 
         # If no names, try again by providing page text to Gemini
         try:
-            resp = requests.get(lab_url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            text_content = soup.get_text(" ", strip=True)
-            snippet = text_content[:7000]
+            # Usually a cache hit: _scrape_personnel_section just fetched this page
+            soup = BeautifulSoup(fetch(lab_url, timeout=10), HTML_PARSER)
+            snippet = _bounded_text(soup, 7000)
 
             prompt2 = (
                 "The following text was scraped from a university research lab web page. "
@@ -249,13 +439,13 @@ def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tupl
                 f"TEXT:\n{snippet}\n\nRespond with JSON now:"
             )
 
-            chat2 = model.generate_content(prompt2, generation_config={"temperature":0.2, "max_output_tokens":256})
+            chat2 = _gemini_generate(model, prompt2, generation_config={"temperature":0.2, "max_output_tokens":256})
             text2 = chat2.text if hasattr(chat2, "text") else chat2.candidates[0].content
 
             names2: list[str] = []
             emails2: dict[str, str] = {}
             try:
-                data2 = json.loads(text2)
+                data2 = json.loads(_extract_json_array(text2))
                 if isinstance(data2, list):
                     for obj in data2:
                         if isinstance(obj, dict) and "name" in obj:
@@ -282,6 +472,20 @@ def _gemini_extract_professors(lab_url: str, college: str | None = None) -> tupl
 # Step-1 – canonical institutional domain
 # ---------------------------------------------------------------------------
 
+
+# Well-known Institute of Technology domains (keys are normalised college names)
+_KNOWN_DOMAINS = {
+    "georgia institute of technology": "gatech.edu",
+    "georgia tech": "gatech.edu",
+    "massachusetts institute of technology": "mit.edu",
+    "california institute of technology": "caltech.edu",
+    "illinois institute of technology": "iit.edu",
+}
+# Words skipped when building abbreviation-based domain guesses
+_DOMAIN_STOPWORDS = frozenset({"of", "the", "at", "for", "and", "in"})
+
+
+@_url_cached
 def get_root_domain(college: str) -> str:
     logger.info("Resolving domain for: %s", college)
     
@@ -295,17 +499,8 @@ def get_root_domain(college: str) -> str:
     # -------------------------------------------------------------------
     # Quick override for well-known Institute of Technology domains
     # -------------------------------------------------------------------
-    known_domains = {
-        "georgia institute of technology": "gatech.edu",
-        "georgia tech": "gatech.edu",
-        "massachusetts institute of technology": "mit.edu",
-        "california institute of technology": "caltech.edu",
-        "illinois institute of technology": "iit.edu",
-    }
-
-    key = college.strip().lower()
-    if key in known_domains:
-        dom = known_domains[key]
+    dom = _KNOWN_DOMAINS.get(college.strip().lower())
+    if dom:
         if _domain_live(dom):
             logger.info("Using known domain mapping: %s -> %s", college, dom)
             return dom
@@ -335,7 +530,7 @@ def get_root_domain(college: str) -> str:
         """Try to guess a .edu domain based on initial letters of college tokens.
 
         e.g. "University of Georgia" -> uga.edu  (ug + a from 'georgia' state code)"""
-        tokens = [t.lower() for t in re.sub(r"[^a-zA-Z ]", " ", college).split() if t.lower() not in {"of", "the", "at", "for", "and", "in"}]
+        tokens = [t for t in _NON_ALPHA_RE.sub(" ", college.lower()).split() if t not in _DOMAIN_STOPWORDS]
         if not tokens:
             return None
 
@@ -353,75 +548,59 @@ def get_root_domain(college: str) -> str:
         if len(college) <= 5 and ' ' not in college:
             candidates.insert(0, f"{college.lower()}.edu")
 
-        for dom in candidates:
-            if _domain_live(dom):
-                logger.info("Guessed live domain: %s", dom)
-                return dom
-        return None
+        # Probe every candidate at once; the earliest live one in the list wins
+        dom = _first_ok(candidates, _live_domain_or_none)
+        if dom:
+            logger.info("Guessed live domain: %s", dom)
+        return dom
 
     # Try abbreviation-based guess
     guess = _guess_domain_from_tokens(college)
     if guess:
         return guess
 
-    # -------------------------------------------------------------------
-    # FINAL ATTEMPT – Ask an LLM (OpenAI) to suggest the official domain
-    # -------------------------------------------------------------------
-    try:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            openai.api_key = api_key
-            prompt = (
-                "You are a knowledge base of US universities. "
-                "Given the college name delimited by triple backticks, return only its primary .edu domain. "
-                "Respond with just the domain, nothing else.\n\nCollege: ```%s```" % college
-            )
-            completion = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo-0125",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=10,
-                temperature=0.0,
-            )
-            dom = completion.choices[0].message.content.strip().lower()
-            if dom.endswith(".edu") and _domain_live(dom):
-                logger.info("LLM provided domain: %s", dom)
-                return dom
-    except Exception as e:
-        logger.warning("LLM domain resolution failed: %s", e)
-
     raise RuntimeError(f"Could not resolve root domain for {college}")
 
 # ---------------------------------------------------------------------------
 # Step-2 – department homepage
 # ---------------------------------------------------------------------------
 
+
+# Candidate department homepages, ``{d}`` being the root domain. Override with a
+# comma-separated list in GRADMATE_DEPT_PATTERNS.
+_DEPT_PATTERN_TEMPLATES = tuple(
+    t.strip() for t in os.getenv("GRADMATE_DEPT_PATTERNS", "").split(",") if t.strip()
+) or (
+    "https://www.cs.{d}",
+    "https://cs.{d}",
+    "https://www.{d}/cs",
+    "https://{d}/cs",
+    "https://scs.{d}",
+    "https://www.scs.{d}",
+    "https://www.{d}/computer-science",
+    "https://{d}/computer-science",
+)
+# Paths appended to the department URL when looking for its research page
+_RESEARCH_PATH_SUFFIXES = (
+    "/research", "/research/",
+    "/labs", "/labs/",
+    "/groups", "/groups/",
+    "/groups-labs", "/groups-labs/",
+)
+
+
+@_url_cached
 def get_department_url(root_domain: str, major: str) -> str:
     logger.info("Finding department URL for %s at %s", major, root_domain)
 
     # Try common URL patterns first
-    common_patterns = [
-        f"https://www.cs.{root_domain}",
-        f"https://cs.{root_domain}",
-        f"https://www.{root_domain}/cs",
-        f"https://{root_domain}/cs",
-        f"https://scs.{root_domain}",
-        f"https://www.scs.{root_domain}",
-        f"https://www.{root_domain}/computer-science",
-        f"https://{root_domain}/computer-science",
-    ]
+    common_patterns = [t.format(d=root_domain) for t in _DEPT_PATTERN_TEMPLATES]
     
-    for pattern in common_patterns:
-        try:
-            logger.info("Testing department pattern: %s", pattern)
-            # Perform a lightweight HEAD request to ensure the full path exists
-            resp = SESSION.head(pattern, allow_redirects=True, timeout=6)
-            if resp.status_code < 400:
-                dept_url = resp.url  # final resolved URL after redirects
-                logger.info("Found department URL: %s (status %s)", dept_url, resp.status_code)
-                return dept_url
-        except Exception as e:
-            logger.debug("Dept pattern failed: %s", e)
-            continue
+    # Lightweight HEAD requests, all in flight at once, to ensure the full path exists
+    dept_url = _first_ok(common_patterns, _head_ok)
+    if dept_url:
+        logger.info("Found department URL: %s", dept_url)
+        return dept_url
 
     # Fallback to search
     logger.info("Trying search-based approach...")
@@ -433,13 +612,13 @@ def get_department_url(root_domain: str, major: str) -> str:
     ]
 
     for query in queries:
-        logger.info("Trying query: %s", query)
+        logger.debug("Trying query: %s", query)
         try:
             hits = safe_text_search(query, max_results=5)
-            logger.info("Got %d hits", len(hits))
+            logger.debug("Got %d hits", len(hits))
             for hit in hits:
                 url = hit.get("href", "") if isinstance(hit, dict) else hit
-                logger.info("Checking URL: %s", url)
+                logger.debug("Checking URL: %s", url)
                 if not url or root_domain not in url:
                     continue
                 path = urlparse(url).path.lower()
@@ -456,53 +635,90 @@ def get_department_url(root_domain: str, major: str) -> str:
 # Step-3 – collect + score internal links
 # ---------------------------------------------------------------------------
 
+
+def _absolute_links(base_url: str, html: str) -> list[tuple[str, str]]:
+    """Return ``(absolute_href, anchor_text)`` for every ``<a href>`` in *html*."""
+    if lxml_html is not None:
+        try:
+            # Link resolution and the anchor walk both run in C – no per-tag soup objects
+            tree = lxml_html.fromstring(html)
+            tree.make_links_absolute(base_url, resolve_base_href=False, handle_failures="discard")
+            # Text nodes joined with a space, as the soup branch's get_text(" ") does,
+            # so "<a>Research<br>Areas</a>" still yields two words
+            return [(a.get("href"), " ".join(a.itertext())) for a in tree.iter("a") if a.get("href")]
+        except Exception:
+            # e.g. str input carrying an XML encoding declaration; use the soup path
+            pass
+    return [
+        (urljoin(base_url, a["href"].strip()), a.get_text(" "))
+        for a in BeautifulSoup(html, HTML_PARSER, parse_only=_A_STRAINER).find_all("a", href=True)
+    ]
+
+
 def score_links(base_url: str, html: str, top_n: int = 5) -> List[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    host = urlparse(base_url).netloc
-
-    scores: Dict[str, int] = {}
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        full = urljoin(base_url, href)
-        p = urlparse(full)
+    host = urlsplit(base_url).netloc
+    finditer = _RESEARCH_WORDS.finditer
+
+    scores: Dict[str, int] = defaultdict(int)
+    for full, anchor_text in _absolute_links(base_url, html):
+        p = urlsplit(full)
         if p.netloc != host:
             continue
         depth = len([seg for seg in p.path.split("/") if seg])
         if depth > 3:
             continue
+        # One regex pass over "path NUL text"; a hit's offset tells which side it came
+        # from, so a path hit still scores 2 and an anchor-text hit 1
+        split = len(p.path)
         score = 0
-        if _RESEARCH_WORDS.search(p.path):
-            score += 2
-        if _RESEARCH_WORDS.search(a.get_text(" ")):
-            score += 1
-        scores[full] = scores.get(full, 0) + score
+        for m in finditer(p.path + "\0" + anchor_text):
+            if m.start() < split:
+                score |= 2
+            else:
+                score |= 1
+                break
+        scores[full] += score
 
-    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
-    return [url for url, _ in ranked[:top_n]]
+    # Same result as sorted(..., reverse=True)[:top_n] without sorting every link
+    ranked = heapq.nlargest(top_n, scores.items(), key=itemgetter(1))
+    return [url for url, _ in ranked]
 
 # ---------------------------------------------------------------------------
 # Step-4 – simple research page detection
 # ---------------------------------------------------------------------------
 
+
 def is_research_page(url: str) -> bool:
     """Simple heuristic to check if a page is a research listing."""
     try:
-        html = fetch(url)
-        # Quick heuristic success
-        if re.search(r"<h[1-4][^>]*>[^<]*research", html, re.I):
-            return True
-        if re.search(r"<h[1-4][^>]*>[^<]*lab", html, re.I):
-            return True
-        if re.search(r"<h[1-4][^>]*>[^<]*group", html, re.I):
-            return True
+        with SESSION.get(url, timeout=10, stream=True) as r:
+            r.raise_for_status()
+            # Quick heuristic success: a heading mentioning research / lab / group.
+            # Scan raw bytes as they arrive and stop at the first hit.
+            buf = b""
+            for chunk in r.iter_content(chunk_size=8192):
+                # Re-scan a little of the previous tail so a heading split across chunks still matches
+                start = max(0, len(buf) - 1024)
+                buf += chunk
+                if _RESEARCH_HEADING_RE.search(buf, start):
+                    return True
+                if len(buf) > _RESEARCH_SCAN_LIMIT:
+                    break
         return False
     except Exception:
         return False
 
+
+def _research_page_or_none(url: str) -> str | None:
+    """Probe adapter for :func:`_first_ok`."""
+    return url if is_research_page(url) else None
+
 # ---------------------------------------------------------------------------
 # Main discovery function
 # ---------------------------------------------------------------------------
 
+
+@_url_cached
 def find_research_url(college: str, major: str = "computer science") -> str:
     """Return URL of the department research/labs page for (*college*, *major*)."""
 
@@ -515,42 +731,30 @@ def find_research_url(college: str, major: str = "computer science") -> str:
     # 2) First attempt – let Gemini give us the exact research page
     gemini_url = _gemini_suggest_research_url(college, major, root)
     if gemini_url:
-        # Prefer Gemini's answer as long as the page exists (status < 400)
+        # Prefer Gemini's answer as long as the page exists (status < 400); a URL
+        # verified recently is trusted without another HEAD round trip
+        verified = _GEMINI_VERIFIED.get(gemini_url)
+        if verified:
+            logger.info("Using Gemini research URL (verified): %s", verified)
+            return verified
         try:
             resp = SESSION.head(gemini_url, allow_redirects=True, timeout=6)
             if resp.status_code < 400:
                 logger.info("Using Gemini research URL: %s", resp.url)
+                _GEMINI_VERIFIED.set(gemini_url, resp.url)
                 return resp.url
         except Exception as e:
             logger.warning("Gemini URL unreachable, falling back: %s", e)
 
     # 3) Heuristic approach – try common department URL patterns first (fast, reliable)
     logger.info("Trying common department URL patterns...")
-    dept_patterns = [
-        f"https://www.cs.{root}",
-        f"https://cs.{root}",
-        f"https://www.{root}/cs",
-        f"https://{root}/cs",
-        f"https://scs.{root}",
-        f"https://www.scs.{root}",
-        f"https://www.{root}/computer-science",
-        f"https://{root}/computer-science",
-    ]
-    
-    dept_url = None
-    for pattern in dept_patterns:
-        try:
-            logger.info("Testing department pattern: %s", pattern)
-            # Perform a lightweight HEAD request to ensure the full path exists
-            resp = SESSION.head(pattern, allow_redirects=True, timeout=6)
-            if resp.status_code < 400:
-                dept_url = resp.url  # final resolved URL after redirects
-                logger.info("Found department URL: %s (status %s)", dept_url, resp.status_code)
-                break
-        except Exception as e:
-            logger.debug("Dept pattern failed: %s", e)
-            continue
+    dept_patterns = [t.format(d=root) for t in _DEPT_PATTERN_TEMPLATES]
     
+    # Lightweight HEAD requests, all in flight at once; resolves to the final URL after redirects
+    dept_url = _first_ok(dept_patterns, _head_ok)
+    if dept_url:
+        logger.info("Found department URL: %s", dept_url)
+
     # 4) If no pattern worked, search for department
     if not dept_url:
         logger.info("No pattern found, searching for department...")
@@ -558,39 +762,25 @@ def find_research_url(college: str, major: str = "computer science") -> str:
     
     # 5) Now find the research page from the department
     logger.info("Looking for research page from: %s", dept_url)
-    dept_html = fetch(dept_url)
+    # The department HTML is only needed for link scoring – download it while the patterns are probed
+    dept_html_future = _PROBE_POOL.submit(fetch, dept_url)
     
     # 6) Try common research URL patterns first
-    research_patterns = [
-        f"{dept_url}/research",
-        f"{dept_url}/research/",
-        f"{dept_url}/labs",
-        f"{dept_url}/labs/",
-        f"{dept_url}/groups",
-        f"{dept_url}/groups/",
-        f"{dept_url}/groups-labs",
-        f"{dept_url}/groups-labs/",
-    ]
-    
-    for pattern in research_patterns:
-        try:
-            logger.info("Testing research pattern: %s", pattern)
-            if is_research_page(pattern):
-                logger.info("Found research URL: %s", pattern)
-                return pattern
-        except Exception:
-            continue
+    research_patterns = [dept_url + suffix for suffix in _RESEARCH_PATH_SUFFIXES]
     
+    research_url = _first_ok(research_patterns, _research_page_or_none)
+    if research_url:
+        logger.info("Found research URL: %s", research_url)
+        return research_url
+
     # 7) Fallback to link scoring
     logger.info("Trying link scoring approach...")
-    for candidate in score_links(dept_url, dept_html):
-        try:
-            if is_research_page(candidate):
-                logger.info("Found research URL via scoring: %s", candidate)
-                return candidate
-        except Exception:
-            continue
-    
+    dept_html = dept_html_future.result()
+    candidate = _first_ok(score_links(dept_url, dept_html), _research_page_or_none)
+    if candidate:
+        logger.info("Found research URL via scoring: %s", candidate)
+        return candidate
+
     # 8) Final fallback: return department URL if nothing else works
     logger.info("No research page found, returning department URL: %s", dept_url)
     return dept_url
@@ -599,6 +789,14 @@ def find_research_url(college: str, major: str = "computer science") -> str:
 # Lab extraction (unchanged from original)
 # ---------------------------------------------------------------------------
 
+
+# Generic or navigation headings that never name a lab
+_GENERIC_HEADINGS = frozenset({
+    "research", "overview", "contact", "news", "groups & labs",
+    "main menu", "mini menu", "support us", "home", "slideshow",
+})
+
+
 def _extract_lab_areas(url: str) -> List[dict]:
     """Scrape the research/labs page and return a list of lab dicts.
 
@@ -610,15 +808,17 @@ def _extract_lab_areas(url: str) -> List[dict]:
     """
 
     try:
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        resp = SESSION.get(url, timeout=10)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = parse_body(resp.content)
     except Exception as exc:
         logger.warning("Failed to fetch research page %s: %s", url, exc)
         return []
 
     labs: list[dict] = []
-    headings = soup.find_all(["h2", "h3", "h4"])
+    # Each heading's section is scanned with a bounded find_all_next, so the
+    # total work is capped by the number of headings taken here
+    headings = soup.find_all(["h2", "h3", "h4"], limit=_MAX_LAB_HEADINGS)
 
     for h in headings:
         title = h.get_text(" ", strip=True)
@@ -626,8 +826,7 @@ def _extract_lab_areas(url: str) -> List[dict]:
             continue
 
         # Skip generic or nav headings
-        generic = {"research", "overview", "contact", "news", "groups & labs", "main menu", "mini menu", "support us", "home", "slideshow"}
-        if title.lower().strip() in generic:
+        if title.lower().strip() in _GENERIC_HEADINGS:
             continue
 
         description_parts: list[str] = []
@@ -658,9 +857,9 @@ def _extract_lab_areas(url: str) -> List[dict]:
             lab_url = None
 
         # Check if heading contains 'Faculty:' pattern directly
-        m = re.search(r"(?:Faculty|Professors?)[:\s]+(.+)", title, re.I)
+        m = _FACULTY_RE.search(title)
         if m:
-            professors = [p.strip() for p in re.split(r",|;", m.group(1)) if p.strip()]
+            professors = [p.strip() for p in _LIST_SEP_RE.split(m.group(1)) if p.strip()]
 
         # Collect professor names & emails within same row container (Drupal pattern)
         row_container = h.find_parent(lambda tag: tag.name == 'div' and 'views-row' in (tag.get('class') or []))
@@ -682,18 +881,18 @@ def _extract_lab_areas(url: str) -> List[dict]:
                         if cand not in professors:
                             professors.append(cand)
 
-        for el in h.next_elements:
-            if isinstance(el, str):
-                continue
-            if el in headings:
-                break  # reached the next heading
-            tag = getattr(el, "name", "")
-            if tag in {"h2", "h3", "h4"}:  # any headline encountered
+        # Only the tags that matter are yielded (no text nodes or inline markup), and
+        # the walk is capped so a heading without a following section stays cheap
+        desc_len = -1  # length of " ".join(description_parts)
+        for el in h.find_all_next(_LAB_SECTION_TAGS, limit=_LAB_SECTION_SCAN):
+            tag = el.name
+            if tag in {"h2", "h3", "h4"}:  # reached the next heading
                 break
             if tag in {"p", "div", "span", "li"}:
                 txt = el.get_text(" ", strip=True)
                 if txt and len(txt) > 40:
                     description_parts.append(txt)
+                    desc_len += len(txt) + 1
                     # also capture first anchor inside this element for url if not yet set
                     if not lab_url:
                         inner_link = el.find('a', href=True)
@@ -711,10 +910,10 @@ def _extract_lab_areas(url: str) -> List[dict]:
                                     lab_url = urljoin(url, link_href)
                     # capture professors if not yet found
                     if not professors:
-                        pm = re.search(r"(?:Faculty|Professors?)[:\s]+(.+)", txt, re.I)
+                        pm = _FACULTY_RE.search(txt)
                         if pm:
-                            professors = [p.strip() for p in re.split(r",|;", pm.group(1)) if p.strip()]
-            if len(" ".join(description_parts)) > 400:
+                            professors = [p.strip() for p in _LIST_SEP_RE.split(pm.group(1)) if p.strip()]
+            if desc_len > 400:
                 break
 
         # Fallback: take first 150 chars of immediate sibling text
@@ -726,15 +925,8 @@ def _extract_lab_areas(url: str) -> List[dict]:
         if not description_parts:
             continue
 
-        # Deduplicate lines inside description
-        deduped: list[str] = []
-        seen_line: set[str] = set()
-        for line in description_parts:
-            if line not in seen_line:
-                seen_line.add(line)
-                deduped.append(line)
-
-        description = "\n".join(deduped[:3])
+        # Deduplicate lines inside description (dict.fromkeys keeps first-seen order)
+        description = "\n".join(list(dict.fromkeys(description_parts))[:3])
         labs.append({
             "name": title,
             "description": description,
@@ -743,20 +935,60 @@ def _extract_lab_areas(url: str) -> List[dict]:
             "lab_url": lab_url,
         })
 
-    # Deduplicate by name
-    seen: set[str] = set()
-    unique_labs = []
+    # Deduplicate by name, keeping the first lab seen under each
+    unique_labs: dict[str, dict] = {}
     for lab in labs:
-        if lab["name"] not in seen:
-            seen.add(lab["name"])
-            unique_labs.append(lab)
+        unique_labs.setdefault(lab["name"], lab)
 
-    return unique_labs[:40]
+    return list(unique_labs.values())[:40]
 
 # ---------------------------------------------------------------------------
 # Public entry point (for Lambda)
 # ---------------------------------------------------------------------------
 
+
+def _enrich_lab(lab: dict, research_url: str, college: str) -> None:
+    """Fill in a lab's URL, professor details and front-end ``faculty`` list in place."""
+
+    # Guarantee every lab has a URL to link to – fall back to the research page itself
+    if not lab.get("lab_url"):
+        lab["lab_url"] = research_url
+
+    # ------------------------------------------------------------------
+    # Enrich professor list via Gemini (optional)
+    # ------------------------------------------------------------------
+    if not lab.get("professors"):
+        # 1) Local quick scrape of 'Personnel' section
+        names, emails, roles = _scrape_personnel_section(lab["lab_url"])
+        # 2) Gemini fallback only if still empty
+        if not names:
+            names, emails = _gemini_extract_professors(lab["lab_url"], college)
+        if names:
+            lab["professors"] = names
+            lab["professor_emails"] = emails or {}
+            lab["professor_roles"] = roles or {}
+
+    # ------------------------------------------------------------------
+    # Build uniform faculty list structure for front-end (name, role, email)
+    # ------------------------------------------------------------------
+    if "faculty" not in lab:
+        fac_list: list[dict] = []
+        for n in lab.get("professors", []):
+            email_val = (lab.get("professor_emails") or {}).get(n, "")
+            if not email_val:
+                email_val = _guess_email_for_name(n, urlparse(lab["lab_url"]).netloc)
+            fac_list.append({
+                "name": n,
+                "role": (lab.get("professor_roles") or {}).get(n, "Professor"),
+                "email": email_val,
+            })
+        lab["faculty"] = fac_list
+
+
+# Upper bound on labs enriched concurrently per request (each is mostly waiting on I/O)
+_ENRICH_MAX_WORKERS = int(os.getenv("ENRICH_MAX_WORKERS", "32"))
+
+
 def discover_labs_data(body: Dict[str, Any]) -> Dict[str, Any]:
     college = body.get("college") or body.get("university")
     major = body.get("major") or "Computer Science"
@@ -771,40 +1003,17 @@ def discover_labs_data(body: Dict[str, Any]) -> Dict[str, Any]:
         
         labs = _extract_lab_areas(research_url)
 
-        # Guarantee every lab has a URL to link to – fall back to the research page itself
-        for lab in labs:
-            if not lab.get("lab_url"):
-                lab["lab_url"] = research_url
-
-            # ------------------------------------------------------------------
-            # Enrich professor list via Gemini (optional)
-            # ------------------------------------------------------------------
-            if not lab.get("professors"):
-                # 1) Local quick scrape of 'Personnel' section
-                names, emails, roles = _scrape_personnel_section(lab["lab_url"])
-                # 2) Gemini fallback only if still empty
-                if not names:
-                    names, emails = _gemini_extract_professors(lab["lab_url"], college)
-                if names:
-                    lab["professors"] = names
-                    lab["professor_emails"] = emails or {}
-                    lab["professor_roles"] = roles or {}
-
-            # ------------------------------------------------------------------
-            # Build uniform faculty list structure for front-end (name, role, email)
-            # ------------------------------------------------------------------
-            if "faculty" not in lab:
-                fac_list: list[dict] = []
-                for n in lab.get("professors", []):
-                    email_val = (lab.get("professor_emails") or {}).get(n, "")
-                    if not email_val:
-                        email_val = _guess_email_for_name(n, urlparse(lab["lab_url"]).netloc)
-                    fac_list.append({
-                        "name": n,
-                        "role": (lab.get("professor_roles") or {}).get(n, "Professor"),
-                        "email": email_val,
-                    })
-                lab["faculty"] = fac_list
+        # Labs are independent and enrichment is all network I/O (personnel page,
+        # profile pages, Gemini) – fan out across labs instead of one after another
+        if labs:
+            with ThreadPoolExecutor(max_workers=min(_ENRICH_MAX_WORKERS, len(labs))) as pool:
+                futures = {pool.submit(_enrich_lab, lab, research_url, college): lab for lab in labs}
+                for fut in as_completed(futures):
+                    # One unreachable lab page must not fail the whole discovery
+                    if fut.exception() is not None:
+                        lab = futures[fut]
+                        logger.warning("Enriching lab %s failed: %s", lab.get("name"), fut.exception())
+                        lab.setdefault("faculty", [])
 
         logger.info("Extracted %d lab areas from %s", len(labs), research_url)
         
@@ -817,13 +1026,19 @@ def discover_labs_data(body: Dict[str, Any]) -> Dict[str, Any]:
         logger.error("Discovery failed: %s", e)
         raise ValueError(f"Could not find research information for {college}. Error: {str(e)}")
 
+
+# Tags _scrape_personnel_section inspects after the section heading, and how many
+_PERSONNEL_TAGS = ["h2", "h3", "h4", "a", "li", "p", "div", "span"]
+_PERSONNEL_SCAN = 500
+
+
 def _scrape_personnel_section(lab_url: str) -> tuple[list[str], dict[str, str], dict[str, str]]:
     """Attempt to parse a 'Personnel' or 'People' section in the lab page locally.
 
     Returns (names, email_map, role_map)."""
     try:
         html = fetch(lab_url, timeout=10)
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, HTML_PARSER)
 
         heading = soup.find(lambda tag: tag and tag.name in {"h2", "h3", "h4"} and any(word in tag.get_text(" ", strip=True).lower() for word in ("personnel", "people", "members", "faculty")))
         if not heading:
@@ -834,15 +1049,16 @@ def _scrape_personnel_section(lab_url: str) -> tuple[list[str], dict[str, str],
         roles: dict[str, str] = {}
         profile_links: dict[str, str] = {}
 
-        for el in heading.next_elements:
-            if getattr(el, "name", "") in {"h2", "h3", "h4"}:
+        # Visit each relevant tag once (no text nodes / inline markup) and dispatch on its name
+        for el in heading.find_all_next(_PERSONNEL_TAGS, limit=_PERSONNEL_SCAN):
+            tag = el.name
+            if tag in {"h2", "h3", "h4"}:
                 break  # new section reached
-            if isinstance(el, str):
-                continue
+            txt = el.get_text(" ", strip=True)
 
             # capture anchors
-            if el.name == "a":
-                anchor_text = el.get_text(" ", strip=True)
+            if tag == "a":
+                anchor_text = txt
                 href = el.get("href", "")
                 # extract email if mailto
                 if href.startswith("mailto:"):
@@ -860,12 +1076,11 @@ def _scrape_personnel_section(lab_url: str) -> tuple[list[str], dict[str, str],
                     profile_links[name_val] = urljoin(lab_url, href)
 
             # also check plain text list items
-            if el.name in {"li", "p", "div", "span"}:
-                txt = el.get_text(" ", strip=True)
+            else:
                 if not txt:
                     continue
                 # emails inside
-                m_mail = re.search(r"[\w.-]+@[\w.-]+\.\w+", txt)
+                m_mail = _EMAIL_RE.search(txt)
                 email_val = m_mail.group(0) if m_mail else ""
                 m_name = PROF_NAME_RE.search(txt)
                 if m_name:
@@ -890,39 +1105,31 @@ def _scrape_personnel_section(lab_url: str) -> tuple[list[str], dict[str, str],
         def _extract_email_from_page(u: str) -> str | None:
             try:
                 html2 = fetch(u, timeout=10)
-                m_mail = re.search(r"[\w.-]+@[\w.-]+\.\w+", html2)
+                if "@" not in html2:
+                    return None
+                m_mail = _EMAIL_RE.search(html2)
                 return m_mail.group(0) if m_mail else None
             except Exception:
                 return None
 
-        for nm in names:
-            if nm not in emails and nm in profile_links:
-                em = _extract_email_from_page(profile_links[nm])
-                if em:
-                    emails[nm] = em
+        # The profile pages are independent – fetch them concurrently. These are leaf
+        # tasks (they never submit more work), so sharing the probe pool is safe.
+        missing = [nm for nm in names if nm not in emails and nm in profile_links]
+        for nm, em in zip(missing, _PROBE_POOL.map(_extract_email_from_page, [profile_links[nm] for nm in missing])):
+            if em:
+                emails[nm] = em
 
         return names, emails, roles
     except Exception as exc:
         logger.debug("Local personnel scrape failed for %s: %s", lab_url, exc)
         return [], {}, {}
 
+
 # Simple heuristic email guesser
 def _guess_email_for_name(name: str, lab_netloc: str) -> str:
     """Return a best‐guess e-mail like jdoe@cs.example.edu based on name + lab host."""
-    try:
-        name_parts = name.lower().split()
-        if len(name_parts) < 2:
-            return ""
-        first, last = name_parts[0], name_parts[-1]
-        user_candidates = [
-            f"{first[0]}{last}",        # jdoe
-            f"{first}.{last}",           # john.doe
-            f"{first}{last[0]}",         # johnd
-        ]
-        host = lab_netloc
-        # strip www.
-        if host.startswith("www."):
-            host = host[4:]
-        return f"{user_candidates[0]}@{host}"
-    except Exception:
-        return "" 
\ No newline at end of file
+    name_parts = name.split()
+    if len(name_parts) < 2:
+        return ""
+    host = lab_netloc[4:] if lab_netloc.startswith("www.") else lab_netloc
+    return f"{name_parts[0][0].lower()}{name_parts[-1].lower()}@{host}"
@@ -2,16 +2,46 @@ import json
 import os
 import logging
 import difflib
+import functools
 import base64
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from urllib.parse import quote_plus
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
 
-import openai
-from openai import OpenAI
-from supabase import create_client
+from src.handlers.cache import TTLCache
+from src.handlers.session import HTML_PARSER, SESSION, normalize_url, parse_body
+
+# rapidfuzz scores names in native code; difflib is the pure-Python fallback
+try:
+    from rapidfuzz import fuzz, process  # type: ignore
+except Exception:  # pragma: no cover
+    fuzz = process = None  # type: ignore
+
+# orjson parses faster than the stdlib; json.loads remains the fallback
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+except Exception:  # pragma: no cover
+    _json_loads = json.loads
+
+# tiktoken gives exact prompt budgets; without it ~4 characters per token is assumed
+try:
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover
+    tiktoken = None  # type: ignore
+
+if TYPE_CHECKING:  # the SDK itself is imported lazily, see _get_openai_client
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -21,56 +51,258 @@ logger.setLevel(logging.INFO)
 # ---------------------------------------------------------------------------
 _SUPABASE_URL = os.getenv("SUPABASE_URL")
 _SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-_supabase_client = None
-if _SUPABASE_URL and _SUPABASE_SERVICE_ROLE_KEY:
+
+# Gateway / rate-limit statuses worth retrying. A PostgREST 500 is a SQL error
+# and would only fail again.
+_RETRYABLE_DB_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _raise_retryable_status(response) -> None:
+    """httpx response hook: turn transient statuses into ``HTTPStatusError`` for ``_execute``."""
+    if response.status_code in _RETRYABLE_DB_STATUSES:
+        response.raise_for_status()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_supabase():
+    """Return the container-wide Supabase client (or None), importing the SDK on first use."""
+    if not (_SUPABASE_URL and _SUPABASE_SERVICE_ROLE_KEY):
+        return None
     try:
-        _supabase_client = create_client(_SUPABASE_URL, _SUPABASE_SERVICE_ROLE_KEY)
+        from supabase import create_client
+
+        client = create_client(_SUPABASE_URL, _SUPABASE_SERVICE_ROLE_KEY)
+        # postgrest puts PostgREST's own code (PGRST.../SQLSTATE) in APIError.code,
+        # not the HTTP status, so transient statuses are flagged on the response
+        client.postgrest.session.event_hooks["response"].append(_raise_retryable_status)
         logger.info("Supabase client initialised successfully [handlers.email]")
+        return client
     except Exception as exc:
         logger.error("Failed to initialise Supabase client: %s", exc)
+        return None
+
+
+# ---------------------------------------------------------------------------
+#  OpenAI client & HTTP session (global, created once per container)
+# ---------------------------------------------------------------------------
+_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+_openai_client: "OpenAI | None" = None
+_openai_lock = threading.Lock()
+
+
+def _get_openai_client() -> "OpenAI | None":
+    """Return the container-wide OpenAI client, importing the SDK on first use.
+
+    Discover requests never call OpenAI, so the SDK import stays off their
+    cold-start path; email requests pay it once per container.
+    """
+    global _openai_client
+    if _openai_client is None and _OPENAI_API_KEY:
+        with _openai_lock:
+            if _openai_client is None:
+                try:
+                    from openai import OpenAI
+
+                    _openai_client = OpenAI(api_key=_OPENAI_API_KEY, timeout=25, max_retries=2)
+                except Exception as exc:
+                    logger.error("Failed to initialise OpenAI client: %s", exc)
+    return _openai_client
+
+
+# Worker pool used to overlap independent I/O (DB look-ups, scraping) within a
+# request. Lives at module scope so warm invocations reuse the threads.
+_EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+
+def _preconnect(url: str) -> None:
+    """Open a pooled keep-alive connection to *url*'s host (result ignored)."""
+    try:
+        SESSION.head(url, timeout=2)
+    except Exception:
+        pass
+
+
+def prewarm() -> None:
+    """Build both API clients and open their connections ahead of the first request.
+
+    Meant for provisioned-concurrency INIT, which runs before any request is
+    routed to the container; a failure here only costs the warm-up.
+    """
+
+    def _warm_openai() -> None:
+        client = _get_openai_client()
+        if client:
+            # with_options shares the client's connection pool, so the warm socket is kept
+            client.with_options(timeout=5, max_retries=0).models.list()
+
+    def _warm_supabase() -> None:
+        supabase = _get_supabase()
+        if supabase:
+            supabase.table("labs").select("id").limit(1).execute()
+
+    # The DuckDuckGo socket lets the first web-search fallback skip DNS + TLS
+    _EXECUTOR.submit(_preconnect, "https://duckduckgo.com/")
+    for fut in [_EXECUTOR.submit(_warm_openai), _EXECUTOR.submit(_warm_supabase)]:
+        try:
+            fut.result(timeout=8)
+        except Exception as exc:
+            logger.warning("Connection pre-warm failed: %s", exc)
+
+
+# If the lab DB lookup has not answered within this many seconds, the web search
+# fallback is started speculatively alongside it
+_SEARCH_HEDGE_SECS = float(os.getenv("SEARCH_HEDGE_SECS", "0.3"))
+
+
+# Warm-container caches. Lab entries hold the scraped description so repeat
+# requests for the same lab skip the scrape.
+_LAB_CACHE = TTLCache(maxsize=512, ttl=int(os.getenv("LAB_CACHE_TTL_SECS", "1800")))
+_PROFILE_CACHE = TTLCache(maxsize=256, ttl=int(os.getenv("PROFILE_CACHE_TTL_SECS", "60")))
+# Extracted page text from scrape_lab_description, keyed by normalised URL
+_SCRAPE_CACHE = TTLCache(maxsize=512, ttl=int(os.getenv("FETCH_CACHE_TTL_SECS", "600")))
+
+# Stored lab descriptions younger than this are used without re-scraping the page
+_LAB_REFRESH_SECS = int(os.getenv("LAB_REFRESH_SECS", "604800"))  # 7 days
+
+# Upper bound on scraped page text; bounds parse work and downstream token cost
+_MAX_SCRAPE_CHARS = 8000
+
+# Regex fallback for professor names, and the placeholders stripped from emails
+_PROF_TITLE_RE = re.compile(r"\b(?:Prof(?:\.?)|Professor|Dr\.?)+\s+([A-Z][a-z]+\s+[A-Z][a-z]+)\b")
+_PHONE_PLACEHOLDER_RE = re.compile(r"\[Phone Number\]|\(Your contact number\)", re.I)
+
+# Prompt budgets (in tokens) for the raw lab text: injected into the email
+# prompt, and sent to the professor-extraction call
+_LAB_CONTEXT_TOKENS = 750
+_PROF_EXTRACT_TOKENS = 3000
+_CHARS_PER_TOKEN = 4
+
+# Chat model for email generation and professor extraction (overridable via env).
+# gpt-4o-mini is markedly faster per output token than gpt-4-turbo.
+_OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+@functools.lru_cache(maxsize=1)
+def _token_encoding():
+    """The tokenizer for ``_OPENAI_MODEL``, or None to fall back to character budgets."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(_OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as exc:  # e.g. the BPE file cannot be downloaded
+        logger.warning("tiktoken unavailable, trimming prompts by characters: %s", exc)
+        return None
+
+
+def _trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut *text* to at most *max_tokens* prompt tokens."""
+    enc = _token_encoding()
+    if enc is None:
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+    tokens = enc.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
+
+
+# Output ceiling, and generation time is linear in it. The prompt caps the body
+# at 200 words (~270 tokens at ~1.3 tokens per word); the subject line,
+# greeting and sign-off take ~40 more, which leaves some headroom before a
+# runaway reply is cut off.
+_EMAIL_MAX_TOKENS = 350
+
+# Email-generation prompt. The system message is byte-identical on every call
+# so it forms a stable prefix for OpenAI's automatic prompt caching; everything
+# request-specific goes in the user message, filled in with str.format.
+_EMAIL_SYSTEM_PROMPT = """
+You are an expert career advisor for computer science students at a top-tier university like Georgia Tech.
+You are helping a student craft the perfect research outreach email to a professor.
+Your goal is to generate a complete email (Subject + Body) that is professional, strategic, and highly personalized, making it stand out in a professor's inbox.
+
+First, take a deep breath and analyze the provided context step-by-step. This is your internal thought process.
+1.  Carefully read the STUDENT PROFILE and the LAB PAGE TEXT. From the lab text, pick out the lab's core research questions, the specific technologies and methods it uses, and any named projects or systems.
+2.  Identify the 2-3 strongest, most specific points of alignment. What skill or project from the student directly maps onto a specific project, technology, or research question from the lab?
+3.  Formulate a "unique value proposition" for the student. What can they *specifically* bring to *this* lab that another student might not?
+
+Now, using your analysis, write the email. Keep the body under 200 words. The output should be ONLY the email, starting with "Subject:".
+""".strip()
+
+_EMAIL_USER_PROMPT = """
+**STUDENT NAME:** {student_name}
+**STUDENT PROFILE:**
+{profile_text}
+---
+**LAB URL:** {lab_url}
+**LAB PAGE TEXT** (raw text scraped from the lab website; use it to ground the email, do not quote it verbatim):
+{lab_context}
+---
+Now, generate the complete outreach email for {professor}, including the subject line.
+""".strip()
 
 # ---------------------------------------------------------------------------
 #  Helper functions (DB look-ups, scraping, summarisation, etc.)
 # ---------------------------------------------------------------------------
 
+# Only the lab columns generate_email_data actually reads
+_LAB_COLUMNS = "id, description, lab_url, school_id, name, etag, last_modified, scraped_at"
+
+
+def _execute(query, attempts: int = 3):
+    """Run ``query.execute()`` retrying transient Supabase failures with jittered backoff."""
+    for attempt in range(attempts):
+        try:
+            return query.execute()
+        except Exception as exc:
+            # HTTPStatusError only comes from _raise_retryable_status
+            transient = isinstance(exc, (httpx.TransportError, httpx.HTTPStatusError))
+            if not transient or attempt == attempts - 1:
+                raise
+            delay = min(4.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.info("Transient Supabase error (%s); retrying in %.2fs", exc, delay)
+            time.sleep(delay)
+
+
 def fetch_user_profile(user_id: str) -> dict:
     """Fetch a user's profile from Supabase or return {} if unavailable."""
-    if not user_id or not _supabase_client:
+    supabase = _get_supabase() if user_id else None
+    if not supabase:
         return {}
+    cached = _PROFILE_CACHE.get(user_id)
+    if cached is not None:
+        return cached
     try:
-        res = (
-            _supabase_client.table("profiles")
+        res = _execute(
+            supabase.table("profiles")
+            # "*": the live profiles table and supabase/schema.sql disagree on
+            # columns, and PostgREST rejects the whole select on any unknown one
             .select("*")
             .eq("id", user_id)
-            .single()
-            .execute()
+            .maybe_single()
         )
-        return res.data or {}
+        profile = (res.data if res else None) or {}
+        if profile:
+            _PROFILE_CACHE.set(user_id, profile)
+        return profile
     except Exception as exc:
-        logger.warning("Unable to fetch profile for user %s: %s", user_id, exc)
+        # The email is still generated, just without personalisation, so make that visible
+        logger.error("Unable to fetch profile for user %s: %s", user_id, exc, exc_info=True)
         return {}
 
 
 def fetch_lab_from_db(lab_title: str, school_name: Optional[str] | None = None):
-    """Return first lab record that fuzzy-matches the given title (and school)."""
-    if not _supabase_client:
+    """Return first lab record that fuzzy-matches the given title (and school).
+
+    Uses the ``get_lab_by_name`` RPC (supabase/scripts/lab_lookup_functions.sql)
+    so the school filter is a join instead of a second round trip.
+    """
+    supabase = _get_supabase()
+    if not supabase:
         return None
     try:
-        q = _supabase_client.table("labs").select("id, description, lab_url, school_id, name").ilike(
-            "name", f"%{lab_title}%"
+        res = _execute(
+            supabase.rpc("get_lab_by_name", {"lab_q": lab_title, "school_q": school_name or None})
         )
-        if school_name:
-            school_res = (
-                _supabase_client.table("schools")
-                .select("id")
-                .ilike("name", f"%{school_name}%")
-                .single()
-                .execute()
-            )
-            school_id = school_res.data["id"] if school_res and school_res.data else None
-            if school_id:
-                q = q.eq("school_id", school_id)
-        res = q.execute()
         if res.data:
             return res.data[0]
     except Exception as exc:
@@ -78,68 +310,109 @@ def fetch_lab_from_db(lab_title: str, school_name: Optional[str] | None = None):
     return None
 
 
+def _get_lab_page(
+    url: str, etag: str | None = None, last_modified: str | None = None
+) -> tuple[bytes | None, dict[str, str | None]]:
+    """GET *url*, conditionally when validators are given.
+
+    Returns ``(content, validators)``; *content* is ``None`` on 304 Not Modified.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    resp = SESSION.get(url, timeout=10, headers=headers)
+    if resp.status_code == 304:
+        return None, {}
+    resp.raise_for_status()
+    return resp.content, {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+
+
+# Page chrome whose text never describes the lab
+_CHROME_TAGS = ["nav", "footer"]
+
+
+def _extract_lab_text(content: bytes) -> str | None:
+    """Pull the readable body text out of a lab page."""
+    # Hand raw bytes to the parser so it decodes once (resp.text would run
+    # requests' charset detection first)
+    soup = parse_body(content)
+    # Drop non-content subtrees up front so the searches below never visit them
+    for junk in soup(["script", "style", "noscript", "template"]):
+        junk.decompose()
+
+    content_area = (
+        soup.find("main")
+        or soup.find("article")
+        or soup.find(id="main")
+        or soup.find(id="content")
+        or soup.find(class_="content")
+        or soup.find(role="main")
+    )
+    search_context = content_area if content_area else soup.body
+    if not search_context:
+        return None
+
+    # Anything inside <nav>/<footer> is skipped. Collect those subtrees in one
+    # pass rather than walking every candidate element's ancestors.
+    if search_context.name in _CHROME_TAGS or search_context.find_parent(_CHROME_TAGS):
+        return None
+    excluded = {id(el) for chrome in search_context.find_all(_CHROME_TAGS) for el in chrome.descendants}
+
+    tags_to_search = ["p", "h1", "h2", "h3", "h4", "li", "div"]
+    text_parts: list[str] = []
+    collected = 0
+    for element in search_context.find_all(tags_to_search):
+        if id(element) in excluded:
+            continue
+        text = element.get_text(" ", strip=True)
+        if len(text) > 30 and "copyright" not in text.lower():
+            text_parts.append(text)
+            collected += len(text)
+            if collected >= _MAX_SCRAPE_CHARS:
+                break
+
+    # dict.fromkeys drops repeated blocks while keeping first-seen order
+    full_text = "\n\n".join(dict.fromkeys(text_parts))[:_MAX_SCRAPE_CHARS]
+    return full_text or None
+
+
 def scrape_lab_description(url: str) -> str | None:
     """Scrape textual content from a lab / research page in a robust way."""
+    key = normalize_url(url)
+    cached = _SCRAPE_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
-        resp = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        content_area = (
-            soup.find("main")
-            or soup.find("article")
-            or soup.find(id="main")
-            or soup.find(id="content")
-            or soup.find(class_="content")
-            or soup.find(role="main")
-        )
-        search_context = content_area if content_area else soup.body
-        if not search_context:
-            return None
-
-        tags_to_search = ["p", "h1", "h2", "h3", "h4", "li", "div"]
-        text_parts: list[str] = []
-        for element in search_context.find_all(tags_to_search):
-            if element.find_parent("nav") or element.find_parent("footer"):
-                continue
-            text = element.get_text(" ", strip=True)
-            if len(text) > 30 and "copyright" not in text.lower():
-                text_parts.append(text)
-
-        unique_parts: list[str] = []
-        seen: set[str] = set()
-        for part in text_parts:
-            if part not in seen:
-                seen.add(part)
-                unique_parts.append(part)
-
-        full_text = "\n\n".join(unique_parts)
-        return full_text or None
+        content, _ = _get_lab_page(url)
+        text = _extract_lab_text(content)
     except Exception as exc:
         logger.warning("Error scraping %s: %s", url, exc)
         return None
+    if text:
+        _SCRAPE_CACHE.set(key, text)
+    return text
 
 
-def summarise_lab(text: str, title: str, client: OpenAI) -> str:
-    """Condense raw lab page text into a structured summary for email generation."""
-    prompt = (
-        "You are an expert research analyst. You have been given the raw text scraped from the website of a research group "
-        f"called '{title}'. Your task is to analyze this text and extract the most salient points that a prospective student "
-        "could use to personalize an outreach email.\n\n"
-        "From the text provided, please identify and list the following:\n"
-        "1.  **Core Research Questions:** What are the 1-3 fundamental questions or key problems the lab is trying to solve?\n"
-        "2.  **Key Technologies & Methods:** What specific tools, software, hardware, or scientific methods are explicitly mentioned (e.g., 'LLVM', 'PyTorch', 'FPGA prototyping', 'formal methods')?\n"
-        "3.  **Specific Project Names:** List any named projects, systems, or initiatives (e.g., 'Project Phoenix', 'ZEBRA architecture').\n\n"
-        "Present these points as a structured summary. This output will be used to draft a compelling email, so be concise and focus on concrete details."
-    )
+def refresh_lab_description(url: str, lab_record: dict | None) -> tuple[str | None, dict[str, str | None]]:
+    """Re-scrape a known lab page, revalidating against the stored ETag / Last-Modified.
 
-    chat = client.chat.completions.create(
-        model="gpt-4-turbo",
-        messages=[{"role": "user", "content": prompt + "\n\nLab content:\n\n" + text}],
-        temperature=0.5,
-        max_tokens=200,
-    )
-    return chat.choices[0].message.content.strip()
+    Returns ``(text, validators)``. On 304 the stored description comes back
+    untouched (no download, no parse) with empty validators.
+    """
+    record = lab_record if lab_record and lab_record.get("lab_url") == url and lab_record.get("description") else {}
+    try:
+        content, validators = _get_lab_page(url, record.get("etag"), record.get("last_modified"))
+        if content is None:
+            return record.get("description"), {}
+        return _extract_lab_text(content), validators
+    except Exception as exc:
+        logger.warning("Error scraping %s: %s", url, exc)
+        return None, {}
 
 
 def summarise_profile(profile: dict) -> str:
@@ -189,35 +462,110 @@ def find_closest_lab_in_db(
     lab_title: str, school_name: Optional[str] | None = None, threshold: float = 0.7
 ):
     """Fuzzy-match helper when exact lab lookup fails."""
-    if not _supabase_client:
+    supabase = _get_supabase()
+    if not supabase:
         return None
     try:
-        q = _supabase_client.table("labs").select("id, description, lab_url, school_id, name")
+        q = supabase.table("labs").select(_LAB_COLUMNS)
         if school_name:
-            school_res = (
-                _supabase_client.table("schools")
+            school_res = _execute(
+                supabase.table("schools")
                 .select("id")
                 .ilike("name", f"%{school_name}%")
-                .single()
-                .execute()
+                .maybe_single()
             )
             school_id = school_res.data["id"] if school_res and school_res.data else None
             if school_id:
                 q = q.eq("school_id", school_id)
-        res = q.execute()
+        res = _execute(q)
         if not res.data:
             return None
+        return _best_fuzzy_match(lab_title, res.data, threshold)
+    except Exception as exc:
+        logger.warning("Fuzzy DB search failed: %s", exc)
+    return None
+
+
+def _update_lab_record(lab_id: Any, payload: dict) -> None:
+    """Persist refreshed lab fields; runs off the request path on the pool.
+
+    Lambda may freeze the container right after the response is returned, in
+    which case the write completes on the next thaw (or is dropped if the
+    container is recycled) - acceptable for this best-effort cache refresh.
+    """
+    try:
+        _execute(_get_supabase().table("labs").update(payload).eq("id", lab_id))
+    except Exception as exc:
+        logger.warning("Failed to update lab description: %s", exc)
+
+
+def _best_fuzzy_match(lab_title: str, rows: list[dict], threshold: float = 0.7) -> dict | None:
+    """Pick the row whose name is closest to *lab_title* if it clears *threshold*."""
+    if not rows:
+        return None
+    title = lab_title.lower()
+    if process is not None:
+        # fuzz.ratio is the same Indel-based similarity as SequenceMatcher.ratio, scaled 0-100
+        hit = process.extractOne(
+            title, [row["name"].lower() for row in rows], scorer=fuzz.ratio, score_cutoff=threshold * 100
+        )
+        if hit is None:
+            return None
+        best, best_score = rows[hit[2]], hit[1] / 100
+    else:
+        # SequenceMatcher caches its index of seq2, so keep the title there
+        matcher = difflib.SequenceMatcher(None, b=title)
         best, best_score = None, 0.0
-        for row in res.data:
-            score = difflib.SequenceMatcher(None, lab_title.lower(), row["name"].lower()).ratio()
+        for row in rows:
+            matcher.set_seq1(row["name"].lower())
+            # quick_ratio is a cheap upper bound on ratio; skip rows that cannot win
+            if matcher.quick_ratio() <= best_score:
+                continue
+            score = matcher.ratio()
             if score > best_score:
                 best, best_score = row, score
-        if best_score >= threshold:
-            logger.info("Fuzzy match succeeded with score %.2f for lab '%s'", best_score, best["name"])
-            return best
+        if best_score < threshold:
+            return None
+    logger.info("Fuzzy match succeeded with score %.2f for lab '%s'", best_score, best["name"])
+    return best
+
+
+def match_lab_in_db(lab_title: str, school_name: Optional[str] | None = None):
+    """Exact-or-fuzzy lab lookup in a single round trip via the ``match_lab`` RPC.
+
+    The RPC returns name-containing rows first, then the closest trigram
+    candidates; those are re-scored with the same fuzzy threshold as
+    :func:`find_closest_lab_in_db`. Raises if the RPC is unavailable.
+    """
+    res = _execute(_get_supabase().rpc("match_lab", {"lab_q": lab_title, "school_q": school_name or None}))
+    rows = res.data or []
+    if rows and rows[0].get("exact"):
+        return rows[0]
+    return _best_fuzzy_match(lab_title, rows)
+
+
+def _lab_needs_refresh(lab_record: dict | None) -> bool:
+    """True unless the record's description was scraped within ``_LAB_REFRESH_SECS``."""
+    scraped_at = (lab_record or {}).get("scraped_at")
+    if not scraped_at:
+        return True
+    try:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(scraped_at)
+    except (TypeError, ValueError):
+        return True
+    return age.total_seconds() > _LAB_REFRESH_SECS
+
+
+def _lookup_lab_record(lab_title: str, school_name: Optional[str] | None = None):
+    """Exact DB lookup with fuzzy fallback, as a single unit of work for the pool."""
+    if not _get_supabase():
+        return None
+    try:
+        return match_lab_in_db(lab_title, school_name)
     except Exception as exc:
-        logger.warning("Fuzzy DB search failed: %s", exc)
-    return None
+        # e.g. match_lab not deployed yet – fall back to the multi-query path
+        logger.warning("match_lab RPC failed, falling back: %s", exc)
+    return fetch_lab_from_db(lab_title, school_name) or find_closest_lab_in_db(lab_title, school_name)
 
 
 def search_lab_online(lab_title: str, school_name: Optional[str] | None = None) -> dict | None:
@@ -226,9 +574,9 @@ def search_lab_online(lab_title: str, school_name: Optional[str] | None = None)
     logger.info("Attempting web search for lab via DuckDuckGo: %s", query)
     try:
         search_url = f"https://duckduckgo.com/html/?q={quote_plus(query)}"
-        resp = requests.get(search_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        resp = SESSION.get(search_url, timeout=10)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(resp.content, HTML_PARSER)
         first_link = soup.select_one("a.result__a")
         if not first_link:
             return None
@@ -240,7 +588,7 @@ def search_lab_online(lab_title: str, school_name: Optional[str] | None = None)
         return None
 
 
-def extract_professors_from_text(text: str, client: OpenAI) -> List[str]:
+def extract_professors_from_text(text: str, client: "OpenAI") -> List[str]:
     """Try LLM extraction first; fallback to regex."""
     if not text:
         return []
@@ -251,40 +599,56 @@ def extract_professors_from_text(text: str, client: OpenAI) -> List[str]:
     )
     try:
         chat = client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
+            model=_OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": prompt},
-                {"role": "user", "content": text[:12000]},
+                {"role": "user", "content": _trim_to_tokens(text, _PROF_EXTRACT_TOKENS)},
             ],
             temperature=0.0,
             max_tokens=150,
             response_format={"type": "json_object"},
         )
-        names = json.loads(chat.choices[0].message.content.strip())
+        names = _json_loads(chat.choices[0].message.content.strip())
         cleaned = [n.strip() for n in names if n and n[0].isupper() and len(n.split()) <= 4]
         return cleaned[:10]
     except Exception as exc:
         logger.warning("OpenAI professor extraction failed: %s", exc)
 
-    import re
-
-    pattern = re.compile(r"\b(?:Prof(?:\.?)|Professor|Dr\.?)+\s+([A-Z][a-z]+\s+[A-Z][a-z]+)\b")
-    matches = pattern.findall(text)
-    unique: list[str] = []
-    for m in matches:
-        if m not in unique:
-            unique.append(m)
-    return unique[:10]
+    return list(dict.fromkeys(_PROF_TITLE_RE.findall(text)))[:10]
 
 # ---------------------------------------------------------------------------
 #  Request validation & main entry
 # ---------------------------------------------------------------------------
 
+
+class EmailRequest(BaseModel):
+    """Typed fields of a generate-email body; other keys pass through untouched."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    lab_title: str
+    professors: list = []
+
+    @field_validator("lab_title")
+    @classmethod
+    def _lab_title_not_blank(cls, value: str) -> str:
+        if not value.strip():
+            raise ValueError("blank")
+        return value
+
+
+_VALIDATION_MESSAGES = {
+    "professors": "Invalid type for professors: expected list",
+}
+
+
 def validate_email_request(body: Dict[str, Any]) -> tuple[bool, Optional[str]]:
-    if "lab_title" not in body or not isinstance(body["lab_title"], str) or not body["lab_title"].strip():
-        return False, "Missing or invalid field: lab_title"
-    if "professors" in body and not isinstance(body["professors"], list):
-        return False, "Invalid type for professors: expected list"
+    try:
+        EmailRequest.model_validate(body)
+    except ValidationError as exc:
+        loc = exc.errors()[0]["loc"]
+        field = loc[0] if loc else None
+        return False, _VALIDATION_MESSAGES.get(field, "Missing or invalid field: lab_title")
     return True, None
 
 
@@ -297,64 +661,113 @@ def generate_email_data(body: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError(f"Invalid request: {err}")
 
     # ------------------------------------------------------------------
-    # 0.  Pull profile (optional)
+    # 0.  Start independent look-ups concurrently (profile ∥ lab record)
     # ------------------------------------------------------------------
-    profile = fetch_user_profile(body.get("user_id")) if body.get("user_id") else {}
+    lab_title = body["lab_title"].strip()
+    school_name = body.get("school")
+
+    user_id = body.get("user_id")
+    profile_future = _EXECUTOR.submit(fetch_user_profile, user_id) if user_id else None
+    # Callers that already hold the lab's URL/text can opt out of the DB match
+    lab_future = (
+        None if body.get("skip_lab_lookup") else _EXECUTOR.submit(_lookup_lab_record, lab_title, school_name)
+    )
+
+    # A slow DB match likely means no row: hedge by starting the web search now.
+    # Its result is simply dropped when the DB (or the body) supplies a lab URL.
+    search_future = None
+    if lab_future and not body.get("lab_url"):
+        try:
+            lab_future.result(timeout=_SEARCH_HEDGE_SECS)
+        except FuturesTimeout:
+            search_future = _EXECUTOR.submit(search_lab_online, lab_title, school_name)
 
     # ------------------------------------------------------------------
     # 1.  Resolve lab description (DB → fuzzy → web search → scraping)
     # ------------------------------------------------------------------
-    lab_title = body["lab_title"].strip()
-    school_name = body.get("school")
-
-    lab_record = fetch_lab_from_db(lab_title, school_name) or find_closest_lab_in_db(lab_title, school_name)
+    lab_record = lab_future.result() if lab_future else None
     lab_url = lab_record.get("lab_url") if lab_record else None
     lab_description = lab_record.get("description") if lab_record else None
 
+    # Text the caller sent is used for this request only: it is never cached, and
+    # no cached text replaces it
+    body_description = None
     if not lab_description and body.get("lab_description"):
-        lab_description = body["lab_description"]
+        lab_description = body_description = body["lab_description"]
 
+    # Text scraped during this request (and from which URL), so no page is fetched twice
+    scraped_text, scraped_url = None, None
     if body.get("lab_url") and not lab_description:
-        lab_description = scrape_lab_description(body["lab_url"])
         lab_url = body["lab_url"]
+        scraped_text, scraped_url = scrape_lab_description(lab_url), lab_url
+        lab_description = scraped_text
 
     newly_found_url = None
     if not lab_url:
-        online = search_lab_online(lab_title, school_name)
+        online = search_future.result() if search_future else search_lab_online(lab_title, school_name)
         if online:
             newly_found_url = online["lab_url"]
             lab_url = newly_found_url
-            if not lab_description and online.get("description"):
-                lab_description = online["description"]
-
-    fresh_text = scrape_lab_description(lab_url) if lab_url else None
-    if fresh_text:
-        lab_description = fresh_text
-        if lab_record and lab_record.get("id") and _supabase_client:
-            try:
-                update_payload = {"description": fresh_text}
-                if newly_found_url:
-                    update_payload["lab_url"] = newly_found_url
-                _supabase_client.table("labs").update(update_payload).eq("id", lab_record["id"]).execute()
-            except Exception as exc:
-                logger.warning("Failed to update lab description: %s", exc)
+            scraped_text, scraped_url = online.get("description"), newly_found_url
+            if not lab_description and scraped_text:
+                lab_description = scraped_text
+    elif search_future:
+        search_future.cancel()  # only helps if it has not started yet
+
+    cache_key = (lab_record.get("id") if lab_record else None, lab_url)
+    cached = _LAB_CACHE.get(cache_key) if lab_url and not body_description else None
+    fresh_future = None
+    if cached:
+        lab_description = cached
+    elif lab_url and lab_url != scraped_url and (not lab_description or _lab_needs_refresh(lab_record)):
+        # Re-scrape in the background; the profile fetch may still be in flight
+        fresh_future = _EXECUTOR.submit(refresh_lab_description, lab_url, lab_record)
 
     # ------------------------------------------------------------------
-    # 2.  OpenAI initialisation
+    # 2.  OpenAI client (built once per container)
     # ------------------------------------------------------------------
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    client = _get_openai_client()
+    if not client:
         raise RuntimeError("OPENAI_API_KEY environment variable is not set")
-    client = OpenAI(api_key=api_key)
 
-    lab_summary = summarise_lab(lab_description, lab_title, client) if lab_description else None
+    write_back = None
+    if not cached:
+        validators: dict = {}
+        if fresh_future:
+            fresh_text, validators = fresh_future.result()
+            if fresh_text:
+                scraped_text = lab_description = fresh_text
+        record = lab_record or {}
+        if scraped_text and record.get("id") and _get_supabase():
+            # Stamp scraped_at on every successful scrape so the next request can skip it
+            write_back = {"scraped_at": datetime.now(timezone.utc).isoformat()}
+            if scraped_text != record.get("description"):
+                write_back["description"] = scraped_text
+            write_back.update({k: v for k, v in validators.items() if v and v != record.get(k)})
+            if newly_found_url:
+                write_back["lab_url"] = newly_found_url
+
+        # Only page or DB text is shared with later requests
+        source_text = scraped_text or (lab_record or {}).get("description")
+        if lab_url and source_text:
+            _LAB_CACHE.set(cache_key, source_text)
 
     # ------------------------------------------------------------------
-    # 3.  Professor list derivation
+    # 3.  Professor list derivation (LLM call overlaps the profile fetch)
     # ------------------------------------------------------------------
     professors: list[str] = body.get("professors", [])
+    professors_future = None
     if not professors and lab_description:
-        professors = extract_professors_from_text(lab_description, client)
+        professors_future = _EXECUTOR.submit(extract_professors_from_text, lab_description, client)
+
+    if write_back:
+        # Fire-and-forget: the response never depends on the write's result
+        _EXECUTOR.submit(_update_lab_record, lab_record["id"], write_back)
+
+    profile = profile_future.result() if profile_future else {}
+
+    if professors_future:
+        professors = professors_future.result()
     if not professors:
         professors = ["Dr. [Last Name]"]
 
@@ -371,44 +784,36 @@ def generate_email_data(body: Dict[str, Any]) -> Dict[str, Any]:
     student_major = body.get("student_major") or profile.get("major") or "Undeclared"
 
     profile_text = summarise_profile(profile)
+    lab_context = _trim_to_tokens(lab_description, _LAB_CONTEXT_TOKENS) if lab_description else None
 
     # ------------------------------------------------------------------
     # 5.  Prompt engineering & LLM call
     # ------------------------------------------------------------------
-    system_prompt = f"""
-You are an expert career advisor for computer science students at a top-tier university like Georgia Tech.
-You are helping a student named {student_name} craft the perfect research outreach email to a professor.
-Your goal is to generate a complete email (Subject + Body) that is professional, strategic, and highly personalized, making it stand out in a professor's inbox.
-
-First, take a deep breath and analyze the provided context step-by-step. This is your internal thought process.
-1.  Carefully read the STUDENT PROFILE and the LAB SUMMARY.
-2.  Identify the 2-3 strongest, most specific points of alignment. What skill or project from the student directly maps onto a specific project, technology, or research question from the lab?
-3.  Formulate a "unique value proposition" for the student. What can they *specifically* bring to *this* lab that another student might not?
-
-Now, using your analysis, write the email. The output should be ONLY the email, starting with "Subject:".
-
----
-
-**STUDENT PROFILE:**
-{profile_text}
----
-**LAB URL:** {lab_url or 'N/A'}
-**LAB SUMMARY:**
-{lab_summary or '(No lab summary was available.)'}
----
-Now, generate the complete email for {professors[0]}.
-"""
-
-    user_prompt = f"Please generate the complete outreach email to {professors[0]}, including the subject line."
+    user_prompt = _EMAIL_USER_PROMPT.format(
+        student_name=student_name,
+        profile_text=profile_text,
+        lab_url=lab_url or "N/A",
+        lab_context=lab_context or "(No lab information was available.)",
+        professor=professors[0],
+    )
 
-    completion = client.chat.completions.create(
-        model="gpt-4-turbo",
-        messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+    # Stream tokens as they are generated; the client read timeout then applies
+    # between chunks rather than to the whole completion.
+    stream = client.chat.completions.create(
+        model=_OPENAI_MODEL,
+        messages=[{"role": "system", "content": _EMAIL_SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}],
+        max_tokens=_EMAIL_MAX_TOKENS,
+        # The prompt's "---" separators must not be echoed back as part of the email
+        stop=["\n\n---"],
+        stream=True,
     )
-    email_text = completion.choices[0].message.content
+    email_parts: list[str] = []
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            email_parts.append(chunk.choices[0].delta.content)
+    email_text = "".join(email_parts)
 
-    import re
     # Remove placeholder phone placeholders
-    email_text = re.sub(r"\[Phone Number\]|\(Your contact number\)", "", email_text, flags=re.I)
+    email_text = _PHONE_PLACEHOLDER_RE.sub("", email_text)
 
-    return {"email": email_text, "lab_summary": lab_summary} 
\ No newline at end of file
+    return {"email": email_text} 
\ No newline at end of file
@@ -1,12 +1,25 @@
 import json
 import base64
+import hmac
+import importlib
 import os
 import traceback
 import logging
 from typing import Any, Dict
 
-from src.handlers.email import generate_email_data, validate_email_request
-from src.handlers.discover import discover_labs_data
+# orjson is markedly faster at (de)serialising; stdlib json remains the fallback.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so handlers below can
+# keep catching the stdlib type.
+try:
+    import orjson  # type: ignore
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except Exception:  # pragma: no cover
+    _json_dumps = json.dumps
+    _json_loads = json.loads
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
@@ -20,26 +33,60 @@ CORS_HEADERS = {
     "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
     "Access-Control-Allow-Methods": "POST,OPTIONS",
 }
+# Optional in-function API key check (API Gateway usage plans normally enforce
+# x-api-key); read once at cold start and compared in constant time
+_EXPECTED_API_KEY = os.getenv("GRADMATE_API_KEY", "").encode()
+
+# Response headers and the constant pre-flight response, built once at cold start
+_RESPONSE_HEADERS = {"Content-Type": "application/json", **CORS_HEADERS}
+_PREFLIGHT_RESPONSE = {
+    "statusCode": 200,
+    "headers": {**CORS_HEADERS, "Access-Control-Max-Age": "86400"},
+    "body": "",
+}
+
+
+def _handler(module: str, name: str):
+    """Import a handler module on first use, so each route only pays its own imports.
+
+    Discover requests never load the OpenAI/Supabase stack and email requests
+    never load the discovery scraper; later calls hit ``sys.modules``.
+    """
+    return getattr(importlib.import_module(f"src.handlers.{module}"), name)
+
+
+# Provisioned-concurrency containers initialise before any request is routed to
+# them, so the imports and TLS handshakes the lazy path would defer are free here
+if os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency":
+    _handler("discover", "discover_labs_data")
+    _handler("email", "prewarm")()
 
 
 def _build_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "statusCode": status_code,
-        "headers": {"Content-Type": "application/json", **CORS_HEADERS},
-        "body": json.dumps(body),
+        "headers": _RESPONSE_HEADERS,
+        "body": _json_dumps(body),
     }
 
 
+def _api_key_valid(event: Dict[str, Any]) -> bool:
+    if not _EXPECTED_API_KEY:
+        return True
+    headers = event.get("headers") or {}
+    api_key = next((v for k, v in headers.items() if k.lower() == "x-api-key"), None)
+    return bool(api_key) and hmac.compare_digest(api_key.encode(), _EXPECTED_API_KEY)
+
+
 def lambda_handler(event, context):  # noqa: D401  (AWS entrypoint)
     """Lightweight API Gateway → business-logic adapter."""
 
     # Handle CORS pre-flight early
     if event.get("httpMethod") == "OPTIONS":
-        return {
-            "statusCode": 200,
-            "headers": {**CORS_HEADERS, "Access-Control-Max-Age": "86400"},
-            "body": "",
-        }
+        return _PREFLIGHT_RESPONSE
+
+    if not _api_key_valid(event):
+        return _build_response(401, {"error": "Unauthorized"})
 
     raw_body = event.get("body") or "{}"
     if event.get("isBase64Encoded"):
@@ -49,14 +96,14 @@ def lambda_handler(event, context):  # noqa: D401  (AWS entrypoint)
             return _build_response(400, {"error": "Malformed base64 body"})
 
     try:
-        body_json = json.loads(raw_body)
+        body_json = _json_loads(raw_body)
     except json.JSONDecodeError:
         return _build_response(400, {"error": "Invalid JSON"})
 
     # Basic routing – determine which handler to invoke
     if "college" in body_json:
         try:
-            data = discover_labs_data(body_json)
+            data = _handler("discover", "discover_labs_data")(body_json)
             return _build_response(200, data)
         except ValueError as ve:
             logger.warning("discoverLabs validation error: %s", ve)
@@ -69,12 +116,12 @@ def lambda_handler(event, context):  # noqa: D401  (AWS entrypoint)
             return _build_response(500, body)
 
     if "lab_title" in body_json:
-        is_valid, error_msg = validate_email_request(body_json)
+        is_valid, error_msg = _handler("email", "validate_email_request")(body_json)
         if not is_valid:
             return _build_response(400, {"error": error_msg})
 
         try:
-            data = generate_email_data(body_json)
+            data = _handler("email", "generate_email_data")(body_json)
             return _build_response(200, data)
         except ValueError as ve:
             logger.warning("generateEmail validation error: %s", ve)
@@ -0,0 +1,62 @@
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# lxml's C parser is much faster than the pure-Python html.parser when present
+try:
+    import lxml.html as lxml_html  # type: ignore
+    HTML_PARSER = "lxml"
+except Exception:  # pragma: no cover
+    lxml_html = None  # type: ignore
+    HTML_PARSER = "html.parser"
+
+# Tree building stops at <head> (inline scripts, styles, JSON-LD, meta tags);
+# the scrapers only ever read the body
+_BODY_ONLY = SoupStrainer("body")
+
+
+def parse_body(markup) -> BeautifulSoup:
+    """Parse only the ``<body>`` of *markup*, falling back to a full parse if it has none."""
+    soup = BeautifulSoup(markup, HTML_PARSER, parse_only=_BODY_ONLY)
+    if soup.body is None:  # fragment without <body> (html.parser does not synthesise one)
+        soup = BeautifulSoup(markup, HTML_PARSER)
+    return soup
+
+
+# ---------------------------------------------------------------------------
+#  Shared HTTP session (module-level, so its keep-alive connections survive
+#  warm Lambda invocations and are reused by every handler)
+# ---------------------------------------------------------------------------
+
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+
+# Pools wide enough for every in-flight request: the discovery probe pool plus
+# the per-request enrichment workers can all target one host (requests' default
+# of 10 per host would drop connections). Throttling / gateway errors get two
+# quick retries; connect failures and read timeouts are not retried, so dead or
+# slow hosts cost one timeout rather than three.
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=2,
+        connect=0,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    ),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of *url* for cache keys: lower-cased scheme/host, no fragment."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
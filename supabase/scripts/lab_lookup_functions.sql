@@ -0,0 +1,54 @@
+-- Lab lookup helpers used by the AI service (src/handlers/email.py)
+
+-- Trigram indexes so the ILIKE '%...%' filters below are index scans ------
+create extension if not exists pg_trgm;
+
+create index if not exists labs_name_trgm on labs using gin (name gin_trgm_ops);
+create index if not exists schools_name_trgm on schools using gin (name gin_trgm_ops);
+
+-- HTTP validators from the last scrape, sent back as a conditional GET, and
+-- when that scrape happened (fresh descriptions are not re-scraped) --------
+alter table labs
+  add column if not exists etag text,
+  add column if not exists last_modified text,
+  add column if not exists scraped_at timestamptz;
+
+-- Resolve a lab (optionally scoped to a school) in a single round trip ----
+-- (dropped first: create or replace cannot change the returned columns)
+drop function if exists public.get_lab_by_name(text, text);
+create function public.get_lab_by_name(lab_q text, school_q text default null)
+returns table (
+  id uuid, description text, lab_url text, school_id uuid, name text,
+  etag text, last_modified text, scraped_at timestamptz
+)
+language sql stable
+as $$
+  select l.id, l.description, l.lab_url, l.school_id, l.name, l.etag, l.last_modified, l.scraped_at
+  from labs l
+  -- left join: labs without a school must still be found by name alone
+  left join schools s on s.id = l.school_id
+  where l.name ilike '%' || lab_q || '%'
+    and (school_q is null or s.name ilike '%' || school_q || '%')
+  limit 1;
+$$;
+
+-- Exact + fuzzy lab match in one round trip ---------------------------------
+-- Rows whose name contains lab_q come first, then the closest trigram matches;
+-- the caller applies its own similarity threshold to the non-exact rows.
+drop function if exists public.match_lab(text, text);
+create function public.match_lab(lab_q text, school_q text default null)
+returns table (
+  id uuid, description text, lab_url text, school_id uuid, name text,
+  etag text, last_modified text, scraped_at timestamptz, exact boolean, score real
+)
+language sql stable
+as $$
+  select l.id, l.description, l.lab_url, l.school_id, l.name, l.etag, l.last_modified, l.scraped_at,
+         l.name ilike '%' || lab_q || '%' as exact,
+         similarity(l.name, lab_q) as score
+  from labs l
+  left join schools s on s.id = l.school_id
+  where school_q is null or s.name ilike '%' || school_q || '%'
+  order by exact desc, score desc
+  limit 10;
+$$;